@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+One-shot migration: add covering indexes for the grade 8 math extraction
+queries in extract-all-states.py, then print the query plan to confirm
+SQLite uses them.
+
+The partial index on achievement matches the exact hot filter
+(subject='math', grade='8', proficiency_rate NOT NULL), so it stays tiny
+and the per-state scan becomes an index-only lookup instead of visiting
+full achievement rows.
+"""
+
+import os
+import sqlite3
+import sys
+
+DB_PATH = "/Volumes/SignatureMi/ohio_education_data/data/ohio_education.db"
+
+INDEXES = [
+    """
+    CREATE INDEX IF NOT EXISTS ix_ach_math8
+    ON achievement(school_id, year, proficiency_rate)
+    WHERE subject = 'math' AND grade = '8' AND proficiency_rate IS NOT NULL
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_schools_district_latlon
+    ON schools(district_id, latitude, longitude)
+    """,
+]
+
+# Representative hot query from extract-all-states.py, used to verify the
+# plan hits the covering index.
+CHECK_SQL = """
+    SELECT sc.name, sc.latitude, sc.longitude, sc.city,
+           d.name, a.proficiency_rate, sc.nces_id
+    FROM schools sc
+    JOIN achievement a ON sc.school_id = a.school_id
+    JOIN districts d ON sc.district_id = d.district_id
+    JOIN states s ON d.state_id = s.state_id
+    WHERE s.state_code = ? AND a.subject = 'math' AND a.grade = '8'
+      AND a.year = ? AND a.proficiency_rate IS NOT NULL
+      AND sc.latitude IS NOT NULL AND sc.longitude IS NOT NULL
+"""
+
+
+def main():
+    if not os.path.exists(DB_PATH):
+        print(f"ERROR: Database not found at {DB_PATH}")
+        print("Make sure the external drive is connected.")
+        sys.exit(1)
+
+    conn = sqlite3.connect(DB_PATH)
+
+    for stmt in INDEXES:
+        print(f"Running: {' '.join(stmt.split()[:6])}...")
+        conn.execute(stmt)
+    conn.execute("ANALYZE")
+    conn.commit()
+
+    print("\nQuery plan for the per-state school scan:")
+    uses_index = False
+    for row in conn.execute("EXPLAIN QUERY PLAN " + CHECK_SQL, ("OH", 2024)):
+        detail = row[3]
+        print(f"  {detail}")
+        if "ix_ach_math8" in detail:
+            uses_index = True
+
+    conn.close()
+
+    if uses_index:
+        print("\nOK: plan uses ix_ach_math8.")
+    else:
+        print("\nWARNING: plan does not mention ix_ach_math8 - check the schema.")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -14,10 +14,10 @@ Then run prepare-map-data.js to project to AlbersUSA pixel coordinates.
 """
 
 import json
+import multiprocessing
 import os
 import sqlite3
 import sys
-from collections import defaultdict
 from pathlib import Path
 
 DB_PATH = "/Volumes/SignatureMi/ohio_education_data/data/ohio_education.db"
@@ -42,48 +42,125 @@ STATE_NAMES = {
 }
 
 
+NUM_WORKERS = 8
+
+# Query text lives in module constants so each connection's statement
+# cache is hit instead of SQLite re-planning per call.
+
+# One grouped query finds the most recent grade 8 math year for every
+# state at once, replacing 51 per-state MAX() round trips.
+MAX_YEARS_SQL = """
+    SELECT s.state_code, MAX(a.year)
+    FROM states s
+    JOIN districts d ON s.state_id = d.state_id
+    JOIN schools sc ON d.district_id = sc.district_id
+    JOIN achievement a ON sc.school_id = a.school_id
+    WHERE a.subject = 'math' AND a.grade = '8'
+      AND a.proficiency_rate IS NOT NULL
+    GROUP BY s.state_code
+"""
+
+SCHOOLS_SQL = """
+    SELECT sc.name, sc.latitude, sc.longitude, sc.city,
+           d.name as district_name, a.proficiency_rate, sc.nces_id
+    FROM schools sc
+    JOIN achievement a ON sc.school_id = a.school_id
+    JOIN districts d ON sc.district_id = d.district_id
+    JOIN states s ON d.state_id = s.state_id
+    WHERE s.state_code = ? AND a.subject = 'math' AND a.grade = '8'
+      AND a.year = ? AND a.proficiency_rate IS NOT NULL
+      AND sc.latitude IS NOT NULL AND sc.longitude IS NOT NULL
+"""
+
+DISTRICT_AGG_SQL = """
+    SELECT d.name, AVG(sc.latitude), AVG(sc.longitude),
+           AVG(a.proficiency_rate), COUNT(*)
+    FROM schools sc
+    JOIN achievement a ON sc.school_id = a.school_id
+    JOIN districts d ON sc.district_id = d.district_id
+    JOIN states s ON d.state_id = s.state_id
+    WHERE s.state_code = ? AND a.subject = 'math' AND a.grade = '8'
+      AND a.year = ? AND a.proficiency_rate IS NOT NULL
+      AND sc.latitude IS NOT NULL AND sc.longitude IS NOT NULL
+      AND d.name IS NOT NULL AND d.name != ''
+    GROUP BY d.name
+"""
+
+CITY_AGG_SQL = """
+    SELECT sc.city, AVG(sc.latitude), AVG(sc.longitude),
+           AVG(a.proficiency_rate), COUNT(*)
+    FROM schools sc
+    JOIN achievement a ON sc.school_id = a.school_id
+    JOIN districts d ON sc.district_id = d.district_id
+    JOIN states s ON d.state_id = s.state_id
+    WHERE s.state_code = ? AND a.subject = 'math' AND a.grade = '8'
+      AND a.year = ? AND a.proficiency_rate IS NOT NULL
+      AND sc.latitude IS NOT NULL AND sc.longitude IS NOT NULL
+      AND sc.city IS NOT NULL AND sc.city != ''
+    GROUP BY sc.city
+"""
+
+# Per-worker state, set up once by _init_worker
+_worker_conn = None
+_worker_naep = None
+
+
 def load_naep():
-    with open(NAEP_FILE) as f:
-        return json.load(f)
-
-
-def extract_state(conn, state_code, naep_data):
-    """Extract grade 8 math proficiency for one state, using most recent year."""
-
-    # Find the most recent year with grade 8 math data for this state
-    cur = conn.execute("""
-        SELECT MAX(a.year)
-        FROM states s
-        JOIN districts d ON s.state_id = d.state_id
-        JOIN schools sc ON d.district_id = sc.district_id
-        JOIN achievement a ON sc.school_id = a.school_id
-        WHERE s.state_code = ? AND a.subject = 'math' AND a.grade = '8'
-          AND a.proficiency_rate IS NOT NULL
-    """, (state_code,))
-
-    row = cur.fetchone()
-    if not row or not row[0]:
-        return None
+    # Read the whole file once; orjson parses it faster when installed
+    data = open(NAEP_FILE, 'rb').read()
+    try:
+        import orjson
+        return orjson.loads(data)
+    except ImportError:
+        return json.loads(data)
 
-    year = row[0]
+
+def open_connection():
+    """Open a SQLite connection tuned for bulk read-only scans."""
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA mmap_size=4294967296")
+    conn.execute("PRAGMA cache_size=-262144")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def _init_worker():
+    """Pool initializer: each worker holds its own connection + NAEP data."""
+    global _worker_conn, _worker_naep
+    _worker_conn = open_connection()
+    _worker_naep = load_naep()
+
+
+def process_state(job):
+    """Extract one (state_code, year) job using the worker's connection
+    and write its JSON.
+
+    Returns (state_code, summary) where summary is None if the state had no data.
+    """
+    state_code, year = job
+    result = extract_state(_worker_conn, state_code, year, _worker_naep)
+
+    if not result:
+        return state_code, None
+
+    out_path = os.path.join(OUTPUT_DIR, f"{state_code}.json")
+    with open(out_path, 'w') as f:
+        f.write(json.dumps(result))
+
+    summary = (result['year'], len(result['schools']),
+               len(result['districts']), len(result['cities']))
+    return state_code, summary
+
+
+def extract_state(conn, state_code, year, naep_data):
+    """Extract grade 8 math proficiency for one state for the given year."""
 
     # Fetch all schools with grade 8 math data for that year
-    cur = conn.execute("""
-        SELECT sc.name, sc.latitude, sc.longitude, sc.city,
-               d.name as district_name, a.proficiency_rate, sc.nces_id
-        FROM schools sc
-        JOIN achievement a ON sc.school_id = a.school_id
-        JOIN districts d ON sc.district_id = d.district_id
-        JOIN states s ON d.state_id = s.state_id
-        WHERE s.state_code = ? AND a.subject = 'math' AND a.grade = '8'
-          AND a.year = ? AND a.proficiency_rate IS NOT NULL
-          AND sc.latitude IS NOT NULL AND sc.longitude IS NOT NULL
-    """, (state_code, year))
-
-    schools = []
-    for row in cur:
-        name, lat, lon, city, district, prof_rate, nces_id = row
-        schools.append({
+    cur = conn.execute(SCHOOLS_SQL, (state_code, year))
+
+    schools = [
+        {
             'name': name,
             'lat': lat,
             'lon': lon,
@@ -91,13 +168,40 @@ def extract_state(conn, state_code, naep_data):
             'district': district or '',
             'city': city or '',
             'ncessch': nces_id or ''
-        })
+        }
+        for name, lat, lon, city, district, prof_rate, nces_id in cur.fetchall()
+    ]
 
     if not schools:
         return None
 
-    # Build aggregates
-    districts, cities = build_aggregates(schools)
+    # District aggregates, computed in SQL so SQLite does the grouping
+    cur = conn.execute(DISTRICT_AGG_SQL, (state_code, year))
+
+    districts = [
+        {
+            'name': name,
+            'lat': lat,
+            'lon': lon,
+            'proficiency': round(prof / 100, 4),
+            'schoolCount': n
+        }
+        for name, lat, lon, prof, n in cur.fetchall()
+    ]
+
+    # City aggregates
+    cur = conn.execute(CITY_AGG_SQL, (state_code, year))
+
+    cities = [
+        {
+            'name': name,
+            'lat': lat,
+            'lon': lon,
+            'proficiency': round(prof / 100, 4),
+            'schoolCount': n
+        }
+        for name, lat, lon, prof, n in cur.fetchall()
+    ]
 
     # NAEP data
     naep_state = naep_data['states'].get(state_code, naep_data['national']['US'])
@@ -117,52 +221,6 @@ def extract_state(conn, state_code, naep_data):
     }
 
 
-def build_aggregates(schools):
-    """Build district and city aggregates from school data."""
-
-    # District aggregation
-    district_data = defaultdict(lambda: {'lats': [], 'lons': [], 'profs': []})
-    for s in schools:
-        d = s['district']
-        if d:
-            district_data[d]['lats'].append(s['lat'])
-            district_data[d]['lons'].append(s['lon'])
-            district_data[d]['profs'].append(s['proficiency'])
-
-    districts = []
-    for name, data in district_data.items():
-        n = len(data['profs'])
-        districts.append({
-            'name': name,
-            'lat': sum(data['lats']) / n,
-            'lon': sum(data['lons']) / n,
-            'proficiency': round(sum(data['profs']) / n, 4),
-            'schoolCount': n
-        })
-
-    # City aggregation
-    city_data = defaultdict(lambda: {'lats': [], 'lons': [], 'profs': []})
-    for s in schools:
-        c = s['city']
-        if c:
-            city_data[c]['lats'].append(s['lat'])
-            city_data[c]['lons'].append(s['lon'])
-            city_data[c]['profs'].append(s['proficiency'])
-
-    cities = []
-    for name, data in city_data.items():
-        n = len(data['profs'])
-        cities.append({
-            'name': name,
-            'lat': sum(data['lats']) / n,
-            'lon': sum(data['lons']) / n,
-            'proficiency': round(sum(data['profs']) / n, 4),
-            'schoolCount': n
-        })
-
-    return districts, cities
-
-
 def main():
     if not os.path.exists(DB_PATH):
         print(f"ERROR: Database not found at {DB_PATH}")
@@ -171,31 +229,33 @@ def main():
 
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    naep = load_naep()
-    conn = sqlite3.connect(DB_PATH)
+    # One grouped query gives every state's most recent year up front
+    conn = open_connection()
+    latest_years = dict(conn.execute(MAX_YEARS_SQL).fetchall())
+    conn.close()
 
     success = 0
     skipped = 0
 
-    for state_code in sorted(STATE_NAMES.keys()):
-        print(f"Processing {state_code} ({STATE_NAMES[state_code]})...", end=" ")
-
-        result = extract_state(conn, state_code, naep)
-
-        if not result:
-            print("SKIPPED (no data)")
+    for state_code in sorted(STATE_NAMES):
+        if state_code not in latest_years:
+            print(f"{state_code} ({STATE_NAMES[state_code]}): SKIPPED (no data)")
             skipped += 1
-            continue
 
-        out_path = os.path.join(OUTPUT_DIR, f"{state_code}.json")
-        with open(out_path, 'w') as f:
-            json.dump(result, f)
+    jobs = sorted((code, latest_years[code])
+                  for code in STATE_NAMES if code in latest_years)
 
-        print(f"year={result['year']}, {len(result['schools'])} schools, "
-              f"{len(result['districts'])} districts, {len(result['cities'])} cities")
-        success += 1
+    with multiprocessing.Pool(processes=NUM_WORKERS, initializer=_init_worker) as pool:
+        for state_code, summary in pool.imap_unordered(process_state, jobs):
+            if not summary:
+                print(f"{state_code} ({STATE_NAMES[state_code]}): SKIPPED (no data)")
+                skipped += 1
+                continue
 
-    conn.close()
+            year, n_schools, n_districts, n_cities = summary
+            print(f"{state_code} ({STATE_NAMES[state_code]}): year={year}, "
+                  f"{n_schools} schools, {n_districts} districts, {n_cities} cities")
+            success += 1
 
     print(f"\nDone! {success} states extracted, {skipped} skipped.")
     print(f"Intermediate files in: {OUTPUT_DIR}")
@@ -13,10 +13,19 @@ Outputs:
 """
 
 import csv
+import hashlib
+import io
+import itertools
 import json
 import os
+import pickle
+import sqlite3
 import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 from pathlib import Path
+from statistics import fmean
 
 # Try to import openpyxl for xlsx files
 try:
@@ -25,12 +34,39 @@ except ImportError:
     print("ERROR: openpyxl required. Install with: pip3 install openpyxl")
     sys.exit(1)
 
+try:
+    import numpy as np
+except ImportError:
+    print("ERROR: numpy required. Install with: pip3 install numpy")
+    sys.exit(1)
+
+# pandas is optional: it vectorizes the aggregate pass when available
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+# numba is also optional: without pandas it JITs the aggregate reduction
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# python-calamine (Rust xlsx reader) is ~5-10x faster than openpyxl's
+# pure-Python parser; fall back to openpyxl when it isn't installed
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
 # Paths
 EDGE_FILE = "/Volumes/SignatureMi/ohio_education_data/data/raw/nces_edge/edge_geocode_2425.csv"
 CCD_FILE = "/Volumes/SignatureMi/ohio_education_data/data/raw/nces_ccd/ccd_sch_029_2425_w_0a_051425.csv"
 ACHIEVEMENT_DIR = "/Volumes/SignatureMi/ohio_education_data/data/raw/state_achievement"
+DB_PATH = "/Volumes/SignatureMi/ohio_education_data/data/ohio_education.db"
 NAEP_FILE = os.path.join(os.path.dirname(__file__), "..", "public", "naep.json")
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "intermediate")
+CACHE_DIR = Path.home() / ".cache" / "coteacher"
 
 # FIPS state codes for name lookup
 FIPS_TO_STATE = {
@@ -64,28 +100,67 @@ STATE_NAMES = {
 }
 
 
+# Struct-of-arrays tables: idx maps int(NCESSCH) → row index into the
+# parallel arrays, so a field access is one int hash + one array slot.
+EdgeTable = namedtuple('EdgeTable', ['idx', 'lats', 'lons', 'names', 'cities', 'states'])
+MetaTable = namedtuple('MetaTable', ['idx', 'districts', 'cities', 'states', 'names', 'leaids'])
+
+
+# Bump whenever EdgeTable/MetaTable or the loaders' semantics change, so
+# pickles written by older code can't be served for the same source file
+CACHE_SCHEMA_VERSION = 2
+
+
+def _cached(path, loader):
+    """Cache a loader's parsed result on disk, keyed by the source file's
+    mtime+size plus the cache schema version, so reruns skip the CSV
+    parse until the file or the loader's output format changes."""
+    key = (CACHE_SCHEMA_VERSION, path, os.path.getmtime(path), os.path.getsize(path))
+    cache = CACHE_DIR / f"{hashlib.md5(str(key).encode()).hexdigest()}.pkl"
+    if cache.exists():
+        with open(cache, 'rb') as f:
+            return pickle.load(f)
+    val = loader()
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(cache, 'wb') as f:
+        pickle.dump(val, f, protocol=5)
+    return val
+
+
+def _slurp_csv(path, delimiter=','):
+    """Read a CSV in one chunk and return a csv.reader over it."""
+    data = open(path, 'rb').read()
+    return csv.reader(io.TextIOWrapper(io.BytesIO(data)), delimiter=delimiter)
+
+
 def load_edge_data():
-    """Load NCES EDGE geocode data: NCESSCH → {lat, lon, name, city}"""
+    """Load NCES EDGE geocode data as an EdgeTable keyed by int(NCESSCH)"""
     print("Loading EDGE geocode data...")
-    edge = {}
-    with open(EDGE_FILE) as f:
-        reader = csv.DictReader(f, delimiter='|')
-        for row in reader:
-            ncessch = row['NCESSCH'].strip()
-            try:
-                lat = float(row['LAT'])
-                lon = float(row['LON'])
-            except (ValueError, KeyError):
-                continue
-            edge[ncessch] = {
-                'lat': lat,
-                'lon': lon,
-                'name': row['NAME'].strip(),
-                'city': row['CITY'].strip(),
-                'state': row['STATE'].strip()
-            }
-    print(f"  Loaded {len(edge)} school coordinates")
-    return edge
+    idx = {}
+    lats = []
+    lons = []
+    names = []
+    cities = []
+    states = []
+    reader = _slurp_csv(EDGE_FILE, delimiter='|')
+    header = next(reader)
+    i_nces, i_lat, i_lon, i_name, i_city, i_state = (
+        header.index(c) for c in ('NCESSCH', 'LAT', 'LON', 'NAME', 'CITY', 'STATE'))
+    for row in reader:
+        try:
+            ncessch = int(row[i_nces])
+            lat = float(row[i_lat])
+            lon = float(row[i_lon])
+        except (ValueError, IndexError):
+            continue
+        idx[ncessch] = len(lats)
+        lats.append(lat)
+        lons.append(lon)
+        names.append(row[i_name].strip())
+        cities.append(row[i_city].strip())
+        states.append(row[i_state].strip())
+    print(f"  Loaded {len(idx)} school coordinates")
+    return EdgeTable(idx, np.asarray(lats), np.asarray(lons), names, cities, states)
 
 
 def load_ccd_crosswalk():
@@ -93,38 +168,72 @@ def load_ccd_crosswalk():
     print("Loading CCD crosswalk...")
     # Build two lookups:
     # 1. ST_SCHID → NCESSCH (for states that use state IDs)
-    # 2. NCESSCH → {district, city} (for metadata)
+    # 2. MetaTable keyed by int(NCESSCH) for district/city metadata
     st_schid_to_ncessch = {}
-    ncessch_meta = {}
-    with open(CCD_FILE) as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            ncessch = row['NCESSCH'].strip()
-            st_schid = row['ST_SCHID'].strip()
-            st_schid_to_ncessch[st_schid] = ncessch
-            ncessch_meta[ncessch] = {
-                'district': row['LEA_NAME'].strip(),
-                'city': row['LCITY'].strip(),
-                'state': row['ST'].strip(),
-                'name': row['SCH_NAME'].strip(),
-                'leaid': row['LEAID'].strip()
-            }
+    idx = {}
+    districts = []
+    cities = []
+    states = []
+    names = []
+    leaids = []
+    reader = _slurp_csv(CCD_FILE)
+    header = next(reader)
+    i_nces, i_schid, i_lea, i_city, i_st, i_name, i_leaid = (
+        header.index(c) for c in
+        ('NCESSCH', 'ST_SCHID', 'LEA_NAME', 'LCITY', 'ST', 'SCH_NAME', 'LEAID'))
+    for row in reader:
+        ncessch = row[i_nces].strip()
+        try:
+            key = int(ncessch)
+        except ValueError:
+            # A non-numeric NCESSCH can't be looked up in the int-keyed
+            # tables, so don't hand it to the extractors via ST_SCHID either
+            continue
+        st_schid_to_ncessch[row[i_schid].strip()] = ncessch
+        idx[key] = len(districts)
+        districts.append(row[i_lea].strip())
+        cities.append(row[i_city].strip())
+        states.append(row[i_st].strip())
+        names.append(row[i_name].strip())
+        leaids.append(row[i_leaid].strip())
     print(f"  Loaded {len(st_schid_to_ncessch)} state ID mappings")
-    return st_schid_to_ncessch, ncessch_meta
+    return st_schid_to_ncessch, MetaTable(idx, districts, cities, states, names, leaids)
 
 
 def load_naep_data():
     """Load NAEP data for state-level stats"""
-    with open(NAEP_FILE) as f:
-        return json.load(f)
+    # One read() of the whole file beats json.load's buffered small reads;
+    # orjson parses the number-heavy payload faster when it's installed
+    data = open(NAEP_FILE, 'rb').read()
+    try:
+        import orjson
+        return orjson.loads(data)
+    except ImportError:
+        return json.loads(data)
+
+
+def S(v):
+    """Strip a cell value to str, or None for empty cells. Branches on
+    type so already-str cells skip the str() call."""
+    if v is None:
+        return None
+    if type(v) is str:
+        return v.strip() or None
+    return str(v).strip() or None
+
+
+_SENTINELS = frozenset({'NC', 'N/A', '', '***', '--', '*', 'NA', 'S', 'n/a', '<10'})
 
 
 def parse_proficiency(val):
     """Parse a proficiency value, returning float or None"""
     if val is None:
         return None
-    s = str(val).strip()
-    if s in ('NC', 'N/A', '', '***', '--', '*', 'NA', 'S', 'n/a', '<10'):
+    # openpyxl hands numeric cells back as int/float: no need to stringify
+    if isinstance(val, (int, float)):
+        return float(val)
+    s = val.strip() if isinstance(val, str) else str(val).strip()
+    if s in _SENTINELS:
         return None
     try:
         return float(s)
@@ -132,100 +241,150 @@ def parse_proficiency(val):
         return None
 
 
+def _finalize_proficiency(schools, denom):
+    """Scale and round every school's proficiency in one vectorized pass
+    instead of a Python round() call per row."""
+    if not schools:
+        return schools
+    profs = np.round(
+        np.fromiter((s['proficiency'] for s in schools), np.float64, len(schools)) / denom, 4)
+    for s, p in zip(schools, profs):
+        s['proficiency'] = float(p)
+    return schools
+
+
+def _calamine_rows(xlsx_path, sheet_name=None):
+    """Return all sheet rows (list of lists, already typed) via
+    python-calamine, or None when it isn't installed."""
+    if CalamineWorkbook is None:
+        return None
+    wb = CalamineWorkbook.from_path(xlsx_path)
+    sheet = wb.get_sheet_by_name(sheet_name) if sheet_name else wb.get_sheet_by_index(0)
+    # calamine hands integral numeric cells back as float (2024.0) where
+    # openpyxl returns int (2024), which breaks str-based grade filters
+    # and join keys; normalize so both readers yield identical rows
+    return [
+        [int(v) if type(v) is float and v.is_integer() else v for v in row]
+        for row in sheet.to_python()
+    ]
+
+
 # === State-specific extractors ===
 
 def extract_ohio(edge, st_schid_to_ncessch, ncessch_meta):
     """Extract Ohio school-level 8th grade math proficiency"""
     xlsx_path = os.path.join(ACHIEVEMENT_DIR, "OH", "24-25_Achievement_Building.xlsx")
     print(f"  Reading {xlsx_path}")
-    wb = openpyxl.load_workbook(xlsx_path, read_only=True)
-    ws = wb['Report_Only_Indicators']
+
+    rows = _calamine_rows(xlsx_path, 'Report_Only_Indicators')
+    if rows is not None:
+        wb = None
+        header = rows[0] if rows else []
+    else:
+        wb = openpyxl.load_workbook(xlsx_path, read_only=True)
+        ws = wb['Report_Only_Indicators']
+        header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True))
 
     schools = []
-    header = None
     math_8_col = None
 
-    for i, row in enumerate(ws.iter_rows(values_only=True)):
-        if i == 0:
-            header = list(row)
-            # Find "8th Grade Math 2024-2025 Percent Proficient or above - Building"
-            for j, h in enumerate(header):
-                if h and '8th Grade Math' in str(h) and '2024-2025' in str(h) and 'Building' in str(h):
-                    math_8_col = j
-                    break
-            if math_8_col is None:
-                print("  ERROR: Could not find 8th grade math column")
-                wb.close()
-                return []
-            continue
+    # Find "8th Grade Math 2024-2025 Percent Proficient or above - Building"
+    for j, h in enumerate(header):
+        if h and '8th Grade Math' in str(h) and '2024-2025' in str(h) and 'Building' in str(h):
+            math_8_col = j
+            break
+    if math_8_col is None:
+        print("  ERROR: Could not find 8th grade math column")
+        if wb:
+            wb.close()
+        return []
+
+    if rows is not None:
+        data_rows = rows[1:]
+    else:
+        # Narrow the column window so openpyxl skips cells we never read
+        data_rows = ws.iter_rows(min_row=2, min_col=1,
+                                 max_col=max(4, math_8_col + 1), values_only=True)
 
-        building_irn = str(row[0]).strip() if row[0] else None
-        building_name = str(row[1]).strip() if row[1] else None
-        district_irn = str(row[2]).strip() if row[2] else None
-        district_name = str(row[3]).strip() if row[3] else None
+    for row in data_rows:
+        building_irn = S(row[0])
+        building_name = S(row[1])
+        district_irn = S(row[2])
+        district_name = S(row[3])
 
         if not building_irn or not district_irn:
             continue
 
-        proficiency = parse_proficiency(row[math_8_col])
+        proficiency = parse_proficiency(row[math_8_col] if math_8_col < len(row) else None)
         if proficiency is None:
             continue
 
         # Join: OH-{district_irn}-{building_irn} → NCESSCH → EDGE
-        st_schid = f"OH-{district_irn}-{building_irn}"
+        # (plain concat: cheaper than an f-string for two substitutions)
+        st_schid = "OH-" + district_irn + "-" + building_irn
         ncessch = st_schid_to_ncessch.get(st_schid)
         if not ncessch:
             continue
 
-        if ncessch not in edge:
+        key = int(ncessch)
+        i = edge.idx.get(key)
+        if i is None:
             continue
 
-        coord = edge[ncessch]
-        meta = ncessch_meta.get(ncessch, {})
+        m = ncessch_meta.idx.get(key)
 
         schools.append({
             'name': building_name,
-            'lat': coord['lat'],
-            'lon': coord['lon'],
-            'proficiency': round(proficiency / 100, 4),
-            'district': district_name or meta.get('district', ''),
-            'city': coord.get('city', '') or meta.get('city', ''),
+            'lat': float(edge.lats[i]),
+            'lon': float(edge.lons[i]),
+            'proficiency': proficiency,  # raw percentage; scaled/rounded in post-pass
+            'district': district_name or (ncessch_meta.districts[m] if m is not None else ''),
+            'city': edge.cities[i] or (ncessch_meta.cities[m] if m is not None else ''),
             'ncessch': ncessch
         })
 
-    wb.close()
-    return schools
+    if wb:
+        wb.close()
+    return _finalize_proficiency(schools, 100.0)
 
 
 def extract_pennsylvania(edge, st_schid_to_ncessch, ncessch_meta):
     """Extract Pennsylvania school-level 8th grade math proficiency"""
     xlsx_path = os.path.join(ACHIEVEMENT_DIR, "PA", "pennsylvania_pssa_school_2024.xlsx")
     print(f"  Reading {xlsx_path}")
-    wb = openpyxl.load_workbook(xlsx_path, read_only=True)
-    ws = wb.active
+
+    rows = _calamine_rows(xlsx_path)
+    if rows is not None:
+        wb = None
+        row_iter = rows
+    else:
+        wb = openpyxl.load_workbook(xlsx_path, read_only=True)
+        ws = wb.active
+        # Only columns 0-14 are read, so cap the iteration window there
+        row_iter = ws.iter_rows(min_col=1, max_col=15, values_only=True)
 
     schools = []
     header = None
     header_row_idx = None
 
-    for i, row in enumerate(ws.iter_rows(values_only=True)):
+    for i, row in enumerate(row_iter):
         vals = list(row)
         if vals and vals[0] == 'Year':
             header = vals
             header_row_idx = i
             continue
-        if header is None:
+        if header is None or len(vals) < 9:
             continue
 
         year = vals[0]
-        aun = str(vals[1]).strip() if vals[1] else None
-        school_number = str(vals[2]).strip() if vals[2] else None
-        district_name = str(vals[4]).strip() if vals[4] else None
-        school_name = str(vals[5]).strip() if vals[5] else None
-        subject = str(vals[6]).strip() if vals[6] else None
-        group = str(vals[7]).strip() if vals[7] else None
+        aun = S(vals[1])
+        school_number = S(vals[2])
+        district_name = S(vals[4])
+        school_name = S(vals[5])
+        subject = S(vals[6])
+        group = S(vals[7])
         grade = vals[8]
-        pct_prof_above = vals[14]  # "Percent Proficient and above"
+        pct_prof_above = vals[14] if len(vals) > 14 else None  # "Percent Proficient and above"
 
         # Filter: Math, All Students, Grade 8
         if subject != 'Math' or group != 'All Students':
@@ -240,66 +399,68 @@ def extract_pennsylvania(edge, st_schid_to_ncessch, ncessch_meta):
         # PA ST_SCHID format: PA-{AUN}-{school_number_no_leading_zeros}
         # CCD uses e.g. PA-112011103-6921, achievement data has 000006921
         sch_num_stripped = str(int(school_number)) if school_number else ''
-        st_schid = f"PA-{aun}-{sch_num_stripped}"
+        st_schid = "PA-" + aun + "-" + sch_num_stripped
         ncessch = st_schid_to_ncessch.get(st_schid)
         if not ncessch:
             continue
 
-        if ncessch not in edge:
+        key = int(ncessch)
+        i = edge.idx.get(key)
+        if i is None:
             continue
 
-        coord = edge[ncessch]
-        meta = ncessch_meta.get(ncessch, {})
+        m = ncessch_meta.idx.get(key)
 
         schools.append({
             'name': school_name,
-            'lat': coord['lat'],
-            'lon': coord['lon'],
-            'proficiency': round(proficiency / 100, 4),
-            'district': district_name or meta.get('district', ''),
-            'city': coord.get('city', '') or meta.get('city', ''),
+            'lat': float(edge.lats[i]),
+            'lon': float(edge.lons[i]),
+            'proficiency': proficiency,  # raw percentage; scaled/rounded in post-pass
+            'district': district_name or (ncessch_meta.districts[m] if m is not None else ''),
+            'city': edge.cities[i] or (ncessch_meta.cities[m] if m is not None else ''),
             'ncessch': ncessch
         })
 
-    wb.close()
-    return schools
+    if wb:
+        wb.close()
+    return _finalize_proficiency(schools, 100.0)
 
 
 def extract_indiana(edge, st_schid_to_ncessch, ncessch_meta):
     """Extract Indiana school-level 8th grade math proficiency"""
     xlsx_path = os.path.join(ACHIEVEMENT_DIR, "IN", "ILEARN-2025-School-All.xlsx")
     print(f"  Reading {xlsx_path}")
-    wb = openpyxl.load_workbook(xlsx_path, read_only=True)
-    ws = wb['Math']
 
     schools = []
-    header = None
-    grade8_prof_col = None
 
-    for i, row in enumerate(ws.iter_rows(values_only=True)):
-        if i < 5:
-            continue
+    # Indiana Math sheet has grade-specific sections after a 6-row preamble
+    # Each grade block: Below, Approaching, At, Above, Total Proficient, Total Tested, %
+    # Grades 3,4,5,6,7,8 + All Grades = 7 blocks × 7 cols = 49 cols + 4 id cols = 53
+    # Grade 8 is the 6th grade block (0-indexed: 5), starting at col 4 + 5*7 = 39
+    # Proficiency % is the 7th col of each block (index 6 within block)
+    # So grade 8 proficiency % = col 4 + 5*7 + 6 = 45
+    grade8_prof_col = 4 + 5 * 7 + 6  # = 45
+
+    rows = _calamine_rows(xlsx_path, 'Math')
+    if rows is not None:
+        wb = None
+        data_rows = rows[6:]  # skip the 6-row preamble + header
+    else:
+        wb = openpyxl.load_workbook(xlsx_path, read_only=True)
+        ws = wb['Math']
+        # Data starts on row 7 (1-based); cap the window at the grade 8 % column
+        data_rows = ws.iter_rows(min_row=7, min_col=1,
+                                 max_col=grade8_prof_col + 1, values_only=True)
+
+    for row in data_rows:
         vals = list(row)
-
-        if i == 5:
-            # This is the header row
-            header = vals
-            # Indiana Math sheet has grade-specific sections
-            # Each grade block: Below, Approaching, At, Above, Total Proficient, Total Tested, %
-            # Grades 3,4,5,6,7,8 + All Grades = 7 blocks × 7 cols = 49 cols + 4 id cols = 53
-            # Grade 8 is the 6th grade block (0-indexed: 5), starting at col 4 + 5*7 = 39
-            # Proficiency % is the 7th col of each block (index 6 within block)
-            # So grade 8 proficiency % = col 4 + 5*7 + 6 = 45
-            grade8_prof_col = 4 + 5 * 7 + 6  # = 45
-            continue
-
-        if header is None:
+        if len(vals) < 4:
             continue
 
-        corp_id = str(vals[0]).strip() if vals[0] else None
-        corp_name = str(vals[1]).strip() if vals[1] else None
-        school_id = str(vals[2]).strip() if vals[2] else None
-        school_name = str(vals[3]).strip() if vals[3] else None
+        corp_id = S(vals[0])
+        corp_name = S(vals[1])
+        school_id = S(vals[2])
+        school_name = S(vals[3])
 
         if not corp_id or not school_id:
             continue
@@ -310,29 +471,31 @@ def extract_indiana(edge, st_schid_to_ncessch, ncessch_meta):
 
         # IN ST_SCHID format: IN-{corp_id}-{school_id}
         # Need to find the right format
-        st_schid = f"IN-{corp_id}-{school_id}"
+        st_schid = "IN-" + corp_id + "-" + school_id
         ncessch = st_schid_to_ncessch.get(st_schid)
         if not ncessch:
             continue
 
-        if ncessch not in edge:
+        key = int(ncessch)
+        i = edge.idx.get(key)
+        if i is None:
             continue
 
-        coord = edge[ncessch]
-        meta = ncessch_meta.get(ncessch, {})
+        m = ncessch_meta.idx.get(key)
 
         schools.append({
             'name': school_name,
-            'lat': coord['lat'],
-            'lon': coord['lon'],
-            'proficiency': round(proficiency, 4),  # Already 0-1 range
-            'district': corp_name or meta.get('district', ''),
-            'city': coord.get('city', '') or meta.get('city', ''),
+            'lat': float(edge.lats[i]),
+            'lon': float(edge.lons[i]),
+            'proficiency': proficiency,  # already 0-1; rounded in post-pass
+            'district': corp_name or (ncessch_meta.districts[m] if m is not None else ''),
+            'city': edge.cities[i] or (ncessch_meta.cities[m] if m is not None else ''),
             'ncessch': ncessch
         })
 
-    wb.close()
-    return schools
+    if wb:
+        wb.close()
+    return _finalize_proficiency(schools, 1.0)
 
 
 def extract_south_carolina(edge, st_schid_to_ncessch, ncessch_meta):
@@ -431,101 +594,204 @@ def extract_colorado(edge, st_schid_to_ncessch, ncessch_meta):
 
 def build_aggregates(schools):
     """Build district and city aggregates from school data"""
-    from collections import defaultdict
-
-    # District aggregation
-    district_data = defaultdict(lambda: {'schools': [], 'lats': [], 'lons': [], 'profs': []})
+    if pd is not None:
+        df = pd.DataFrame(schools)
+        return _aggregate_pandas(df, 'district'), _aggregate_pandas(df, 'city')
+    if njit is not None:
+        return _aggregate_numba(schools, 'district'), _aggregate_numba(schools, 'city')
+    return _build_aggregates_python(schools)
+
+
+def _aggregate_pandas(df, col):
+    """One vectorized groupby pass over the school frame."""
+    g = df[df[col] != ''].groupby(col, sort=False).agg(
+        lat=('lat', 'mean'),
+        lon=('lon', 'mean'),
+        proficiency=('proficiency', 'mean'),
+        schoolCount=('name', 'size'),
+    ).reset_index()
+    return [
+        {
+            'name': name,
+            'lat': float(lat),
+            'lon': float(lon),
+            'proficiency': round(float(prof), 4),
+            'schoolCount': int(n)
+        }
+        for name, lat, lon, prof, n in g.itertuples(index=False)
+    ]
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _group_sum(ids, vals, ngroups):
+        out = np.zeros(ngroups)
+        cnt = np.zeros(ngroups, np.int64)
+        for i in range(ids.size):
+            g = ids[i]
+            out[g] += vals[i]
+            cnt[g] += 1
+        return out, cnt
+
+
+def _aggregate_numba(schools, col):
+    """Grouped means via the JIT-compiled reduction kernel."""
+    group_ids = {}
+    ids = []
+    kept = []
     for s in schools:
-        d = s['district']
-        if d:
-            district_data[d]['schools'].append(s)
-            district_data[d]['lats'].append(s['lat'])
-            district_data[d]['lons'].append(s['lon'])
-            district_data[d]['profs'].append(s['proficiency'])
+        name = s[col]
+        if not name:
+            continue
+        ids.append(group_ids.setdefault(name, len(group_ids)))
+        kept.append(s)
+    if not kept:
+        return []
 
-    districts = []
-    for name, data in district_data.items():
-        n = len(data['schools'])
-        districts.append({
+    n = len(kept)
+    ids = np.asarray(ids, dtype=np.int32)
+    ngroups = len(group_ids)
+    # float64 throughout: numba vectorizes the reduction without widening
+    lats = np.fromiter((s['lat'] for s in kept), np.float64, n)
+    lons = np.fromiter((s['lon'] for s in kept), np.float64, n)
+    profs = np.fromiter((s['proficiency'] for s in kept), np.float64, n)
+
+    lat_sum, cnt = _group_sum(ids, lats, ngroups)
+    lon_sum, _ = _group_sum(ids, lons, ngroups)
+    prof_sum, _ = _group_sum(ids, profs, ngroups)
+
+    return [
+        {
             'name': name,
-            'lat': sum(data['lats']) / n,
-            'lon': sum(data['lons']) / n,
-            'proficiency': round(sum(data['profs']) / n, 4),
-            'schoolCount': n
-        })
+            'lat': float(lat_sum[g] / cnt[g]),
+            'lon': float(lon_sum[g] / cnt[g]),
+            'proficiency': round(float(prof_sum[g] / cnt[g]), 4),
+            'schoolCount': int(cnt[g])
+        }
+        for name, g in group_ids.items()
+    ]
 
-    # City aggregation
-    city_data = defaultdict(lambda: {'schools': [], 'lats': [], 'lons': [], 'profs': []})
-    for s in schools:
-        c = s['city']
-        if c:
-            city_data[c]['schools'].append(s)
-            city_data[c]['lats'].append(s['lat'])
-            city_data[c]['lons'].append(s['lon'])
-            city_data[c]['profs'].append(s['proficiency'])
 
-    cities = []
-    for name, data in city_data.items():
-        n = len(data['schools'])
-        cities.append({
+def _build_aggregates_python(schools):
+    """Pure-Python fallback when neither pandas nor numba is installed."""
+    return _aggregate_python(schools, 'district'), _aggregate_python(schools, 'city')
+
+
+def _aggregate_python(schools, col):
+    """Sort once and walk groups with itertools.groupby: no per-key
+    defaultdict factory calls or per-group list triples."""
+    key = itemgetter(col)
+    out = []
+    for name, group in itertools.groupby(sorted(
+            (s for s in schools if s[col]), key=key), key=key):
+        group = list(group)
+        out.append({
             'name': name,
-            'lat': sum(data['lats']) / n,
-            'lon': sum(data['lons']) / n,
-            'proficiency': round(sum(data['profs']) / n, 4),
-            'schoolCount': n
+            'lat': fmean(s['lat'] for s in group),
+            'lon': fmean(s['lon'] for s in group),
+            'proficiency': round(fmean(s['proficiency'] for s in group), 4),
+            'schoolCount': len(group)
         })
+    return out
+
+
+# State extractors
+EXTRACTORS = {
+    'OH': extract_ohio,
+    'PA': extract_pennsylvania,
+    'IN': extract_indiana,
+}
+
 
-    return districts, cities
+HAS_STATE_SQL = """
+    SELECT 1
+    FROM achievement a
+    JOIN schools sc ON a.school_id = sc.school_id
+    JOIN districts d ON d.district_id = sc.district_id
+    JOIN states s ON s.state_id = d.state_id
+    WHERE s.state_code = ? AND a.subject = 'math' AND a.grade = '8'
+      AND a.proficiency_rate IS NOT NULL
+    LIMIT 1
+"""
+
+
+def sqlite_has_state(state_code):
+    """True if extract-all-states.py already covers this state from the
+    SQLite database, making the xlsx parse redundant."""
+    if not os.path.exists(DB_PATH):
+        return False
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return conn.execute(HAS_STATE_SQL, (state_code,)).fetchone() is not None
+    finally:
+        conn.close()
+
+
+def _run_extractor(state_code):
+    """Worker entry point: load the shared tables (a pickle-cache hit
+    after the parent primes it) and run one state's extractor."""
+    edge = _cached(EDGE_FILE, load_edge_data)
+    st_schid_to_ncessch, ncessch_meta = _cached(CCD_FILE, load_ccd_crosswalk)
+    return EXTRACTORS[state_code](edge, st_schid_to_ncessch, ncessch_meta)
 
 
 def main():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    # Load shared data
-    edge = load_edge_data()
-    st_schid_to_ncessch, ncessch_meta = load_ccd_crosswalk()
+    # Don't re-parse xlsx for states the SQLite pipeline already covers
+    codes = []
+    for code in EXTRACTORS:
+        if sqlite_has_state(code):
+            print(f"Skipping {code}: already covered by the SQLite pipeline")
+        else:
+            codes.append(code)
+
+    if not codes:
+        print("\nNothing to extract: all states covered by the SQLite pipeline.")
+        return
+
+    # Prime the pickle cache once so every pool worker gets a cache hit
+    _cached(EDGE_FILE, load_edge_data)
+    _cached(CCD_FILE, load_ccd_crosswalk)
     naep = load_naep_data()
 
-    # State extractors
-    extractors = {
-        'OH': extract_ohio,
-        'PA': extract_pennsylvania,
-        'IN': extract_indiana,
-    }
-
-    # Process each state
-    for state_code, extractor in extractors.items():
-        print(f"\n=== Processing {state_code} ({STATE_NAMES.get(state_code, '')}) ===")
-        schools = extractor(edge, st_schid_to_ncessch, ncessch_meta)
-        print(f"  Extracted {len(schools)} schools with 8th grade math data")
-
-        if not schools:
-            print(f"  SKIPPING {state_code} (no data)")
-            continue
+    # Run the extractors in parallel: openpyxl parsing is CPU bound, so
+    # wall time is the slowest state instead of the sum of all three
+    with ProcessPoolExecutor(max_workers=len(codes)) as ex:
+        futures = {code: ex.submit(_run_extractor, code) for code in codes}
 
-        districts, cities = build_aggregates(schools)
-        print(f"  Aggregated into {len(districts)} districts, {len(cities)} cities")
-
-        # Get NAEP data
-        naep_state = naep['states'].get(state_code, naep['national']['US'])
-
-        output = {
-            'state': state_code,
-            'stateName': STATE_NAMES.get(state_code, state_code),
-            'naep': {
-                'text': naep_state['text'],
-                'numerator': naep_state.get('numerator', 0),
-                'denominator': naep_state.get('denominator', 0)
-            },
-            'schools': schools,
-            'districts': districts,
-            'cities': cities
-        }
+        for state_code, fut in futures.items():
+            print(f"\n=== Processing {state_code} ({STATE_NAMES.get(state_code, '')}) ===")
+            schools = fut.result()
+            print(f"  Extracted {len(schools)} schools with 8th grade math data")
+
+            if not schools:
+                print(f"  SKIPPING {state_code} (no data)")
+                continue
+
+            districts, cities = build_aggregates(schools)
+            print(f"  Aggregated into {len(districts)} districts, {len(cities)} cities")
+
+            # Get NAEP data
+            naep_state = naep['states'].get(state_code, naep['national']['US'])
+
+            output = {
+                'state': state_code,
+                'stateName': STATE_NAMES.get(state_code, state_code),
+                'naep': {
+                    'text': naep_state['text'],
+                    'numerator': naep_state.get('numerator', 0),
+                    'denominator': naep_state.get('denominator', 0)
+                },
+                'schools': schools,
+                'districts': districts,
+                'cities': cities
+            }
 
-        out_path = os.path.join(OUTPUT_DIR, f"{state_code}.json")
-        with open(out_path, 'w') as f:
-            json.dump(output, f, indent=2)
-        print(f"  Wrote {out_path}")
+            out_path = os.path.join(OUTPUT_DIR, f"{state_code}.json")
+            with open(out_path, 'w') as f:
+                f.write(json.dumps(output))
+            print(f"  Wrote {out_path}")
 
     print("\nDone! Run prepare-map-data.js next to project coordinates.")
 